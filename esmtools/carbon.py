@@ -4,11 +4,232 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import xarray as xr
-from tqdm import tqdm
 
 from .checks import is_xarray
-from .constants import CONCAT_KWARGS
-from .stats import linregress, nanmean, rm_poly
+from .constants import CONCAT_KWARGS, SPCO2_DRIVERS, SPCO2_TERMS
+from .stats import nanmean, rm_poly
+
+
+def _check_spco2_terms(ds):
+    """Checks that ``ds`` contains all variables needed for the pCO2 decomposition.
+
+    Args:
+        ds (xr.Dataset): Dataset to check for the variables in ``SPCO2_TERMS``.
+
+    Raises:
+        ValueError: If any of the variables in ``SPCO2_TERMS`` are missing.
+    """
+    if not all(i in ds.data_vars for i in SPCO2_TERMS):
+        missingVars = [i for i in SPCO2_TERMS if i not in ds.data_vars]
+        raise ValueError(
+            f"""Missing variables needed for calculation:
+            {missingVars}"""
+        )
+
+
+def _is_dask(ds):
+    """Returns True if any variable in ``ds`` is backed by a dask array.
+
+    ``Dataset.chunks`` raises if variables are chunked differently along a
+    dimension, so the check is made variable by variable.
+
+    Args:
+        ds (xarray object): Data to check.
+
+    Returns:
+        bool: Whether ``ds`` holds dask-backed data.
+    """
+    if isinstance(ds, xr.DataArray):
+        return ds.chunks is not None
+    return any(v.chunks is not None for v in ds.data_vars.values())
+
+
+def _maybe_astype(ds, dtype):
+    """Casts ``ds`` to ``dtype``, unless ``dtype`` is None.
+
+    Args:
+        ds (xarray object): Data to cast.
+        dtype (str or np.dtype): Type to cast to. If None, return ``ds`` unmodified.
+
+    Returns:
+        xarray object: ``ds`` as ``dtype``.
+    """
+    if dtype is None:
+        return ds
+    return ds.astype(dtype)
+
+
+def _deseasonalize(ds):
+    """Removes the monthly climatology from ``ds``.
+
+    The climatology is gathered at the month of each time step and subtracted in a
+    single broadcast operation, rather than group by group.
+
+    Args:
+        ds (xarray object): Data with a datetime ``time`` dimension.
+
+    Returns:
+        xarray object: ``ds`` with its monthly climatology removed.
+    """
+    clim = ds.groupby('time.month').mean('time')
+    if _is_dask(clim):
+        # With a single chunk along month, dask gathers the seasonal cycle in one
+        # task per block rather than one per time step.
+        clim = clim.chunk({'month': -1})
+    seasonal_cycle = clim.sel(month=ds['time.month']).drop_vars('month')
+    return ds - seasonal_cycle
+
+
+def _get_spco2_drivers(ds):
+    """Returns the drivers of surface pCO2 from ``ds``, ready for anomaly generation.
+
+    Only the drivers are needed as anomalies in the decomposition, which saves
+    detrending ``spco2`` itself. Detrending and deseasonalizing operate along the
+    full time axis, so dask-backed data is rechunked to a single chunk in time once
+    here rather than by each operation.
+
+    Args:
+        ds (xr.Dataset): Dataset containing the variables in ``SPCO2_DRIVERS``.
+
+    Returns:
+        xr.Dataset: The variables in ``SPCO2_DRIVERS``.
+    """
+    ds = ds[SPCO2_DRIVERS]
+    if _is_dask(ds):
+        ds = ds.chunk({'time': -1})
+    return ds
+
+
+def _scale_in_place(ds, factor):
+    """Multiplies each variable in ``ds`` by the matching variable in ``factor``,
+    writing the result into the memory of ``ds``.
+
+    ``factor`` is broadcast as a view, so in-memory data is scaled without
+    allocating a second copy of ``ds``. Dask-backed variables are scaled lazily,
+    and variables whose type would be promoted by the product are scaled into a
+    new array.
+
+    Args:
+        ds (xr.Dataset): Data to scale. Its arrays are overwritten.
+        factor (xr.Dataset): Factors to scale by, broadcastable against ``ds``.
+
+    Returns:
+        xr.Dataset: ``ds``, scaled by ``factor``.
+    """
+    for var in ds.data_vars:
+        in_place = isinstance(ds[var].data, np.ndarray) and isinstance(
+            factor[var].data, np.ndarray
+        )
+        if (
+            in_place
+            and np.result_type(ds[var].dtype, factor[var].dtype) == ds[var].dtype
+        ):
+            f = factor[var].broadcast_like(ds[var]).transpose(*ds[var].dims)
+            np.multiply(ds[var].data, f.data, out=ds[var].data)
+        else:
+            ds[var] = ds[var] * factor[var]
+    return ds
+
+
+def _window_sum(ds, starts, ends, dim='time'):
+    """Sums of ``ds`` over the windows ``[starts, ends]`` along ``dim``.
+
+    Each window sum is taken as the difference of two cumulative sums, so the cost
+    does not grow with the window length. The cumulative sums are accumulated in
+    float64, since differencing them in single precision loses most of the
+    significant digits of each window sum.
+
+    Args:
+        ds (xarray object): Data to sum. Must not contain NaNs.
+        starts, ends (ndarray): Integer positions of the first and last (inclusive)
+            element of each window along ``dim``.
+        dim (str, optional): Dimension to compute window sums over.
+
+    Returns:
+        xarray object: Sum of each window, labeled by the ``dim`` coordinate of the
+            window end.
+    """
+    csum = ds.cumsum(dim, dtype='float64')
+    # Exclusive cumulative sum, so the sum through ``starts - 1`` is zero for a
+    # window starting at the first element.
+    csum_before = csum.shift({dim: 1}, fill_value=0)
+    end = csum.isel({dim: ends}).drop_vars(dim, errors='ignore')
+    total = end - csum_before.isel({dim: starts}).drop_vars(dim, errors='ignore')
+    if dim in ds.coords:
+        total[dim] = ds[dim].isel({dim: ends})
+    return total
+
+
+def _window_mean(ds, starts, ends, dim='time'):
+    """Means of ``ds`` over the windows ``[starts, ends]`` along ``dim``.
+
+    Matches :py:func:`~esmtools.stats.nanmean` applied to each window: NaNs count
+    as zero, and windows are masked where their first element is NaN.
+
+    Args:
+        ds (xarray object): Data to average.
+        starts, ends (ndarray): Integer positions of the first and last (inclusive)
+            element of each window along ``dim``.
+        dim (str, optional): Dimension to compute window means over.
+
+    Returns:
+        xarray object: Mean of each window, labeled by the ``dim`` coordinate of
+            the window end.
+    """
+    n = xr.DataArray(ends - starts + 1, dims=[dim])
+    mean = _window_sum(ds.fillna(0), starts, ends, dim) / n
+    mask = ds.isnull().isel({dim: starts}).drop_vars(dim, errors='ignore')
+    return mean.where(~mask)
+
+
+def _window_regression_slope(x, y, starts, ends, dim='time'):
+    """Least-squares slopes of ``y`` regressed onto ``x`` over the windows
+    ``[starts, ends]`` along ``dim``.
+
+    The slopes are formed from window sums of ``x``, ``y``, ``x*y`` and ``x*x``, so
+    windows may differ in length and the cost does not grow with the window length.
+
+    Args:
+        x (xarray object): Predictor.
+        y (xarray object): Predictand.
+        starts, ends (ndarray): Integer positions of the first and last (inclusive)
+            element of each window along ``dim``.
+        dim (str, optional): Dimension to regress over.
+
+    Returns:
+        xarray object: Slope for each window, labeled by the ``dim`` coordinate of
+            the window end. NaN for windows where ``x`` or ``y`` has a NaN.
+    """
+    # Centering ``x`` leaves the slope unchanged but limits cancellation in the
+    # sums of products below.
+    x = x - x.mean(dim)
+    xy = x * y
+    n = xr.DataArray(ends - starts + 1, dims=[dim])
+    sum_x = _window_sum(x.fillna(0), starts, ends, dim)
+    sum_y = _window_sum(y.fillna(0), starts, ends, dim)
+    sum_xy = _window_sum(xy.fillna(0), starts, ends, dim)
+    sum_xx = _window_sum((x * x).fillna(0), starts, ends, dim)
+    slope = (sum_xy - sum_x * sum_y / n) / (sum_xx - sum_x * sum_x / n)
+    has_nan = _window_sum(xy.isnull().astype('int64'), starts, ends, dim) > 0
+    return slope.where(~has_nan)
+
+
+def _regression_slope(x, y):
+    """Least-squares slope of ``y`` regressed onto ``x`` along the last axis.
+
+    The slope is computed in closed form as cov(x, y) / var(x), so only the slope is
+    formed rather than a full regression for each predictand.
+
+    Args:
+        x, y (ndarray): Predictor and predictand, with the regression axis last.
+
+    Returns:
+        ndarray: Slope of the linear fit, reduced over the last axis.
+    """
+    x_anom = x - x.mean(axis=-1, dtype='float64', keepdims=True)
+    y_anom = y - y.mean(axis=-1, dtype='float64', keepdims=True)
+    cov = (x_anom * y_anom).sum(axis=-1, dtype='float64')
+    return cov / (x_anom * x_anom).sum(axis=-1, dtype='float64')
 
 
 def calculate_compatible_emissions(global_co2_flux, co2atm_forcing):
@@ -67,17 +288,14 @@ def co2_sol(t, s):
         a = [-162.8301, 218.2968, 90.9241, -1.47696]
         b = [0.025695, -0.025225, 0.0049867]
         t = (t + 273.15) * 0.01
-        t_sq = t ** 2
-        t_inv = 1.0 / t
-        log_t = np.log(t)
-        d0 = b[2] * t_sq + b[1] * t + b[0]
+        # Horner form of a0 + a3*t^2 + (b0 + b1*t + b2*t^2)*s, with the salinity
+        # terms folded into the coefficients of each power of t.
+        poly = (a[0] + b[0] * s) + t * (b[1] * s + t * (a[3] + b[2] * s))
         # Compute solubility in mol.kg^{-1}.atm^{-1}
-        ff = np.exp(a[0] + a[1] * t_inv + a[2] * log_t + a[3] * t_sq + d0 * s)
+        ff = np.exp(poly + a[1] / t + a[2] * np.log(t))
         return ff
 
-    ff = xr.apply_ufunc(
-        sol_calc, t, s, input_core_dims=[[], []], vectorize=True, dask='allowed'
-    )
+    ff = xr.apply_ufunc(sol_calc, t, s, input_core_dims=[[], []], dask='allowed')
     ff.attrs['units'] = 'mol/kg/atm'
     return ff
 
@@ -217,8 +435,16 @@ def potential_pco2(t_insitu, pco2_insitu):
             dims=['time', 'lat', 'depth'])
         >>> pco2_potential = potential_pco2(t_insitu, pco2_insitu)
     """
+
+    def _potential_pco2(pco2_insitu, t_insitu, t_sfc):
+        return pco2_insitu * (1 + 0.0423 * (t_sfc - t_insitu))
+
     t_sfc = t_insitu.isel(depth=0)
-    pco2_potential = pco2_insitu * (1 + 0.0423 * (t_sfc - t_insitu))
+    # ``pco2_insitu`` is passed first so the output follows its dimension order,
+    # and mismatched coordinates are inner joined, as with xarray arithmetic.
+    pco2_potential = xr.apply_ufunc(
+        _potential_pco2, pco2_insitu, t_insitu, t_sfc, join='inner', dask='allowed'
+    )
     return pco2_potential
 
 
@@ -249,17 +475,18 @@ def schmidt(t):
 
     def calc_schmidt(t):
         c = [2073.1, 125.62, 3.6276, 0.043219]
-        Sc = c[0] - c[1] * t + c[2] * (t ** 2) - c[3] * (t ** 3)
+        # Horner form of c0 - c1*t + c2*t^2 - c3*t^3.
+        Sc = c[0] + t * (-c[1] + t * (c[2] - c[3] * t))
         return Sc
 
-    Sc = xr.apply_ufunc(
-        calc_schmidt, t, input_core_dims=[[]], vectorize=True, dask='allowed'
-    )
+    Sc = xr.apply_ufunc(calc_schmidt, t, input_core_dims=[[]], dask='allowed')
     return Sc
 
 
 @is_xarray(0)
-def spco2_decomposition(ds_terms, detrend=True, order=1, deseasonalize=False):
+def spco2_decomposition(
+    ds_terms, detrend=True, order=1, deseasonalize=False, dtype=None
+):
     """Decompose oceanic surface pco2 in a first order Taylor-expansion.
 
     Args:
@@ -274,6 +501,11 @@ def spco2_decomposition(ds_terms, detrend=True, order=1, deseasonalize=False):
         order (int): If detrend is true, the order polynomial to remove from
                      your time series.
         deseasonalize (bool): If True, deseasonalize when generating anomalies.
+        dtype (str or np.dtype, optional): If given, compute the sensitivities
+                     and store the anomalies in this type, e.g. 'float32' to
+                     reduce memory use. The time mean of the sensitivities is
+                     accumulated in float64, and detrending is still done in
+                     float64. Defaults to None, which keeps the input type.
 
     Return:
         terms_in_pCO2_units (xr.Dataset): terms of spco2 decomposition
@@ -285,26 +517,45 @@ def spco2_decomposition(ds_terms, detrend=True, order=1, deseasonalize=False):
           (2007). https://doi.org/10/fpv2wt.
 
     """
-    pco2_sensitivity = spco2_sensitivity(ds_terms)
-
+    _check_spco2_terms(ds_terms)
     if detrend and not order:
         raise KeyError(
             """Please provide the order of polynomial you would like
                        to remove from your time series."""
         )
-    elif detrend:
-        ds_terms_anomaly = rm_poly(ds_terms, order=order, dim='time')
+    # The sensitivities are reduced over time before the anomalies are formed, so
+    # the full sensitivity and anomaly fields are never held at the same time.
+    pco2_sensitivity = spco2_sensitivity(ds_terms, dtype=dtype)
+    if dtype is None:
+        pco2_sensitivity = pco2_sensitivity.mean('time')
     else:
+        pco2_sensitivity = pco2_sensitivity.mean('time', dtype='float64').astype(dtype)
+
+    ds_drivers = _get_spco2_drivers(ds_terms)
+    if not detrend:
         warnings.warn('Your data are not being detrended.')
-        ds_terms_anomaly = ds_terms - ds_terms.mean('time')
+    # ``rm_poly`` returns float64, so the anomalies are cast to ``dtype`` one driver
+    # at a time to hold only a single driver at full precision.
+    ds_terms_anomaly = xr.Dataset()
+    for var in SPCO2_DRIVERS:
+        if detrend:
+            anomaly = rm_poly(ds_drivers[var], order=order, dim='time')
+        else:
+            anomaly = ds_drivers[var] - ds_drivers[var].mean('time')
+        ds_terms_anomaly[var] = _maybe_astype(anomaly, dtype)
 
     if deseasonalize:
-        clim = ds_terms_anomaly.groupby('time.month').mean('time')
-        ds_terms_anomaly = ds_terms_anomaly.groupby('time.month') - clim
+        ds_terms_anomaly = _deseasonalize(ds_terms_anomaly)
     else:
         warnings.warn('Your data are not being deseasonalized.')
 
-    terms_in_pCO2_units = pco2_sensitivity.mean('time') * ds_terms_anomaly
+    # The anomalies are not used past this point, so they are scaled in place.
+    terms_in_pCO2_units = _scale_in_place(ds_terms_anomaly, pco2_sensitivity)
+    # Detrending moves time to the last axis, so restore the order of the input.
+    for var in terms_in_pCO2_units.data_vars:
+        terms_in_pCO2_units[var] = terms_in_pCO2_units[var].transpose(
+            *ds_terms[var].dims
+        )
     return terms_in_pCO2_units
 
 
@@ -318,6 +569,8 @@ def spco2_decomposition_index(
     deseasonalize=False,
     plot=False,
     sliding_window=10,
+    pco2_sensitivity=None,
+    dtype=None,
     **plot_kwargs,
 ):
     """Decompose oceanic surface pco2 in a first order Taylor-expansion.
@@ -338,6 +591,16 @@ def spco2_decomposition_index(
         plot (bool): quick plot. Defaults to False.
         sliding_window (int): Number of years to apply sliding window to for
                               calculation. Defaults to 10.
+        pco2_sensitivity (xr.Dataset, optional): Output of
+                              ``spco2_sensitivity(ds_terms)``. Pass this to
+                              reuse the sensitivities when decomposing the
+                              same ``ds_terms`` against several indices. If
+                              None, they are computed from ``ds_terms``.
+        dtype (str or np.dtype, optional): If given, cast the anomalies, index
+                              and sensitivities to this type, e.g. 'float32' to
+                              reduce memory use. The regression sums are still
+                              accumulated in float64. Defaults to None, which
+                              keeps the input type.
         **plot_kwargs (type): `**plot_kwargs`.
 
     Returns:
@@ -354,52 +617,72 @@ def spco2_decomposition_index(
           16.2 (2019): 329-346.
 
     """
-
-    def regression_against_index(ds, index, psig=None):
-        terms = dict()
-        for term in ds.data_vars:
-            if term != 'spco2':
-                reg = linregress(index, ds[term], psig=psig)
-                terms[term] = reg['slope']
-        terms = xr.Dataset(terms)
-        return terms
-
-    pco2_sensitivity = spco2_sensitivity(ds_terms)
+    _check_spco2_terms(ds_terms)
+    if pco2_sensitivity is None:
+        pco2_sensitivity = spco2_sensitivity(ds_terms, dtype=dtype)
+    elif 'time' not in pco2_sensitivity.dims:
+        raise ValueError(
+            """pco2_sensitivity must have a time dimension. Pass the output of
+            spco2_sensitivity(ds_terms) rather than its time mean."""
+        )
+    else:
+        pco2_sensitivity = _maybe_astype(pco2_sensitivity, dtype)
+    ds_drivers = _get_spco2_drivers(ds_terms)
     if detrend and not order:
         raise KeyError(
             """Please provide the order of polynomial to remove from
                        your time series if you are using detrend."""
         )
     elif detrend:
-        ds_terms_anomaly = rm_poly(ds_terms, order=order, dim='time')
+        ds_terms_anomaly = rm_poly(ds_drivers, order=order, dim='time')
     else:
         warnings.warn('Your data are not being detrended.')
-        ds_terms_anomaly = ds_terms - nanmean(ds_terms)
+        ds_terms_anomaly = ds_drivers - nanmean(ds_drivers)
+    ds_terms_anomaly = _maybe_astype(ds_terms_anomaly, dtype)
+    index = _maybe_astype(index, dtype)
 
     if deseasonalize:
-        clim = ds_terms_anomaly.groupby('time.month').mean('time')
-        ds_terms_anomaly = ds_terms_anomaly.groupby('time.month') - clim
+        ds_terms_anomaly = _deseasonalize(ds_terms_anomaly)
     else:
         warnings.warn('Your data are not being deseasonalized.')
 
+    # Restrict the anomalies and sensitivities to the time span of the index.
+    index, ds_terms_anomaly, pco2_sensitivity = xr.align(
+        index, ds_terms_anomaly, pco2_sensitivity
+    )
     # Apply sliding window to regressions. I.e., compute in N year chunks
     # then average the resulting dpCO2/dX.
     if sliding_window is None:
-        terms = regression_against_index(ds_terms_anomaly, index)
+        if index.chunks:
+            index = index.chunk({'time': -1})
+        terms = xr.apply_ufunc(
+            _regression_slope,
+            index,
+            ds_terms_anomaly,
+            input_core_dims=[['time'], ['time']],
+            dask='parallelized',
+            output_dtypes=['float64'],
+        )
         terms_in_pCO2_units = terms * nanmean(pco2_sensitivity)
     else:
-        years = [y for y in index.groupby('time.year').groups]
-        y_end = index['time.year'][-1]
-        res = []
-        for y1 in tqdm(years):
-            y2 = y1 + sliding_window
-            if y2 <= y_end:
-                ds = ds_terms_anomaly.sel(time=slice(str(y1), str(y2)))
-                ind = index.sel(time=slice(str(y1), str(y2)))
-                terms = regression_against_index(ds, ind)
-                sens = pco2_sensitivity.sel(time=slice(str(y1), str(y2)))
-                res.append(terms * nanmean(sens))
-        terms_in_pCO2_units = xr.concat(res, dim='time').mean('time')
+        # Each window spans from the start of a year through the end of the year
+        # ``sliding_window`` years later. Window boundaries are found once as
+        # integer positions along time.
+        years = index['time.year'].values
+        first_years = np.unique(years)
+        first_years = first_years[first_years + sliding_window <= years[-1]]
+        if first_years.size == 0:
+            raise ValueError(
+                f"""sliding_window of {sliding_window} years does not fit in the
+                time series, which spans the years {years[0]} to {years[-1]}."""
+            )
+        starts = np.searchsorted(years, first_years, side='left')
+        ends = np.searchsorted(years, first_years + sliding_window, side='right') - 1
+
+        terms = _window_regression_slope(index, ds_terms_anomaly, starts, ends)
+        sens = _window_mean(pco2_sensitivity, starts, ends)
+        terms_in_pCO2_units = (terms * sens).mean('time')
+    terms_in_pCO2_units = _maybe_astype(terms_in_pCO2_units, dtype)
 
     if plot:
         terms_in_pCO2_units.to_array().plot(
@@ -410,7 +693,7 @@ def spco2_decomposition_index(
 
 
 @is_xarray(0)
-def spco2_sensitivity(ds):
+def spco2_sensitivity(ds, dtype=None):
     """Compute sensitivity of surface pCO2 to changes in driver variables.
 
     Args:
@@ -420,6 +703,9 @@ def spco2_sensitivity(ds):
                          * dissicos[mmol m-3]: DIC at ocean surface
                          * tos [C] : temperature at ocean surface
                          * sos [psu] : salinity at ocean surface
+        dtype (str or np.dtype, optional): If given, cast the variables to this
+                         type before computing, e.g. 'float32' to reduce memory
+                         use. Defaults to None, which keeps the input type.
 
     Returns:
         sensitivity (xr.Dataset):
@@ -450,43 +736,40 @@ def spco2_sensitivity(ds):
         >>> sensitivity = spco2_sensitivity(ds)
     """
 
-    def _check_variables(ds):
-        requiredVars = ['spco2', 'tos', 'sos', 'talkos', 'dissicos']
-        if not all(i in ds.data_vars for i in requiredVars):
-            missingVars = [i for i in requiredVars if i not in ds.data_vars]
-            raise ValueError(
-                f"""Missing variables needed for calculation:
-            {missingVars}"""
-            )
-
-    _check_variables(ds)
+    def _sensitivity(DIC, ALK, SALT, pCO2):
+        # The ALK and DIC buffer factors, -ALK^2 / denom and DIC * (3*ALK - 2*DIC) /
+        # denom, share a denominator. Dividing them by ALK and DIC, respectively,
+        # cancels one factor from each numerator.
+        pCO2_denom = pCO2 / ((2 * DIC - ALK) * (ALK - DIC))
+        s_tos = 0.0423 * pCO2
+        s_sos = pCO2 / SALT
+        s_talkos = -ALK * pCO2_denom
+        s_dissicos = (3 * ALK - 2 * DIC) * pCO2_denom
+        # Ordered as in ``SPCO2_DRIVERS``.
+        return s_tos, s_sos, s_talkos, s_dissicos
+
+    _check_spco2_terms(ds)
     # Sensitivities are based on the time-mean for each field. This computes
     # sensitivities at each grid cell.
     # TODO: Add keyword for sliding mean, as in N year chunks of time to
     # account for trends.
-    DIC = ds['dissicos']
-    ALK = ds['talkos']
-    SALT = ds['sos']
-    pCO2 = ds['spco2']
-
-    buffer_factor = dict()
-    buffer_factor['ALK'] = -(ALK ** 2) / ((2 * DIC - ALK) * (ALK - DIC))
-    buffer_factor['DIC'] = (3 * ALK * DIC - 2 * DIC ** 2) / (
-        (2 * DIC - ALK) * (ALK - DIC)
+    sensitivity = xr.apply_ufunc(
+        _sensitivity,
+        _maybe_astype(ds['dissicos'], dtype),
+        _maybe_astype(ds['talkos'], dtype),
+        _maybe_astype(ds['sos'], dtype),
+        _maybe_astype(ds['spco2'], dtype),
+        output_core_dims=[[]] * len(SPCO2_DRIVERS),
+        dask='allowed',
     )
-
-    # Compute sensitivities
-    sensitivity = dict()
-    sensitivity['tos'] = 0.0423
-    sensitivity['sos'] = 1 / SALT
-    sensitivity['talkos'] = (1 / ALK) * buffer_factor['ALK']
-    sensitivity['dissicos'] = (1 / DIC) * buffer_factor['DIC']
-    sensitivity = xr.Dataset(sensitivity) * pCO2
+    sensitivity = xr.Dataset(dict(zip(SPCO2_DRIVERS, sensitivity)))
     return sensitivity
 
 
 @is_xarray(0)
-def temp_decomp_takahashi(ds, time_dim='time', temperature='tos', pco2='spco2'):
+def temp_decomp_takahashi(
+    ds, time_dim='time', temperature='tos', pco2='spco2', dtype=None
+):
     """Decompose surface pCO2 into thermal and non-thermal components.
 
     .. note::
@@ -497,6 +780,10 @@ def temp_decomp_takahashi(ds, time_dim='time', temperature='tos', pco2='spco2'):
         ds (xarray.Dataset): Contains two variables:
             * `tos` (sea surface temperature in degC)
             * `spco2` (surface pCO2 in uatm)
+        dtype (str or np.dtype, optional): If given, cast the variables to this type
+            before computing, e.g. 'float32' to reduce memory use. Time means are
+            still taken at the precision of ``ds``. Defaults to None, which keeps
+            the input type.
 
     Return:
         decomp (xr.Dataset): Decomposed thermal and non-thermal components.
@@ -526,12 +813,24 @@ def temp_decomp_takahashi(ds, time_dim='time', temperature='tos', pco2='spco2'):
     if pco2 not in ds.data_vars:
         raise ValueError(f'{pco2} is not a variable in your dataset.')
 
+    def _takahashi(tos, tos_mean, pco2, pco2_mean, fac):
+        # exp(-x) is the reciprocal of exp(x), so a single exponential serves both
+        # the thermal and non-thermal components.
+        e = np.exp((tos - tos_mean) * fac)
+        return pco2_mean * e, pco2 / e
+
     fac = 0.0432
-    tos_mean = ds[temperature].mean(time_dim)
-    tos_diff = ds[temperature] - tos_mean
-    thermal = (ds[pco2].mean(time_dim) * (np.exp(tos_diff * fac))).rename('thermal')
-    non_thermal = (ds[pco2] * (np.exp(tos_diff * -fac))).rename('non_thermal')
-    decomp = xr.merge([thermal, non_thermal])
+    thermal, non_thermal = xr.apply_ufunc(
+        _takahashi,
+        _maybe_astype(ds[temperature], dtype),
+        _maybe_astype(ds[temperature].mean(time_dim), dtype),
+        _maybe_astype(ds[pco2], dtype),
+        _maybe_astype(ds[pco2].mean(time_dim), dtype),
+        fac,
+        output_core_dims=[[], []],
+        dask='allowed',
+    )
+    decomp = xr.merge([thermal.rename('thermal'), non_thermal.rename('non_thermal')])
     decomp.attrs[
         'description'
     ] = 'Takahashi decomposition of pCO2 into thermal and non-thermal components.'
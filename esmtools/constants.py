@@ -41,3 +41,7 @@ CALENDARS = [k for k in DAYS_PER_MONTH]
 
 # Useful when concatting list comprehension results. Speeds things up.
 CONCAT_KWARGS = {'coords': 'minimal', 'compat': 'override'}
+
+# Variables required for the surface pCO2 decomposition.
+SPCO2_DRIVERS = ['tos', 'sos', 'talkos', 'dissicos']
+SPCO2_TERMS = ['spco2'] + SPCO2_DRIVERS
@@ -162,3 +162,41 @@ def annual_julian():
         "1990", freq="YS", periods=data.time.size, calendar="julian"
     )
     return data
+
+
+@pytest.fixture()
+def ds_terms():
+    """Mock surface carbonate system terms at monthly resolution for ten years."""
+    # Wrapper so fixture can be called multiple times.
+    # https://alysivji.github.io/pytest-fixures-with-function-arguments.html
+    def _gen_data():
+        shape = (120, 3, 3)
+        ranges = {
+            "tos": (15, 30),
+            "sos": (30, 35),
+            "spco2": (350, 400),
+            "dissicos": (1900, 2100),
+            "talkos": (2100, 2300),
+        }
+        ds = xr.Dataset()
+        for var, (low, high) in ranges.items():
+            data = np.random.uniform(low, high, size=shape)
+            ds[var] = xr.DataArray(data, dims=["time", "lat", "lon"])
+        # Monthly resolution time axis for 10 years.
+        ds["time"] = np.arange("1990-01", "2000-01", dtype="datetime64[M]")
+        return ds
+
+    return _gen_data
+
+
+@pytest.fixture()
+def climate_index():
+    """Mock climate index on the monthly time axis of ``ds_terms``."""
+    # Wrapper so fixture can be called multiple times.
+    # https://alysivji.github.io/pytest-fixures-with-function-arguments.html
+    def _gen_data():
+        index = xr.DataArray(np.random.rand(120), dims=["time"])
+        index["time"] = np.arange("1990-01", "2000-01", dtype="datetime64[M]")
+        return index
+
+    return _gen_data
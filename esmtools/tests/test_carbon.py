@@ -0,0 +1,363 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from esmtools.carbon import (
+    co2_sol,
+    potential_pco2,
+    schmidt,
+    spco2_decomposition,
+    spco2_decomposition_index,
+    spco2_sensitivity,
+    temp_decomp_takahashi,
+)
+from esmtools.stats import nanmean
+
+
+def test_spco2_sensitivity_missing_variables(ds_terms):
+    """Tests that an error is raised if a required variable is missing."""
+    ds = ds_terms().drop_vars('tos')
+    with pytest.raises(ValueError, match='Missing variables'):
+        spco2_sensitivity(ds)
+
+
+def test_spco2_sensitivity(ds_terms):
+    """Tests that sensitivities match the buffer factor formulation of Lovenduski et
+    al. (2007)."""
+    ds = ds_terms()
+    DIC, ALK = ds['dissicos'], ds['talkos']
+    buffer_alk = -(ALK ** 2) / ((2 * DIC - ALK) * (ALK - DIC))
+    buffer_dic = (3 * ALK * DIC - 2 * DIC ** 2) / ((2 * DIC - ALK) * (ALK - DIC))
+    sensitivity = spco2_sensitivity(ds)
+    xr.testing.assert_allclose(sensitivity['tos'], 0.0423 * ds['spco2'])
+    xr.testing.assert_allclose(sensitivity['sos'], ds['spco2'] / ds['sos'])
+    xr.testing.assert_allclose(sensitivity['talkos'], ds['spco2'] * buffer_alk / ALK)
+    xr.testing.assert_allclose(sensitivity['dissicos'], ds['spco2'] * buffer_dic / DIC)
+
+
+def test_spco2_decomposition_uses_mean_sensitivity(ds_terms):
+    """Tests that the decomposition scales anomalies by the time mean of the
+    sensitivities."""
+    ds = ds_terms()
+    terms = spco2_decomposition(ds, detrend=False)
+    sens = spco2_sensitivity(ds).mean('time')
+    anomaly = ds - ds.mean('time')
+    for var in ['tos', 'sos', 'talkos', 'dissicos']:
+        xr.testing.assert_allclose(terms[var], anomaly[var] * sens[var])
+
+
+@pytest.mark.parametrize('detrend', [True, False])
+def test_spco2_decomposition_dim_order(ds_terms, detrend):
+    """Tests that the decomposition keeps the dimension order of the input."""
+    ds = ds_terms()
+    terms = spco2_decomposition(ds, detrend=detrend)
+    for var in terms.data_vars:
+        assert terms[var].dims == ('time', 'lat', 'lon')
+    terms = spco2_decomposition(ds.transpose('lat', 'lon', 'time'), detrend=detrend)
+    for var in terms.data_vars:
+        assert terms[var].dims == ('lat', 'lon', 'time')
+
+
+def test_spco2_decomposition_promotes_dtype(ds_terms):
+    """Tests that scaling a single precision driver by double precision
+    sensitivities returns double precision, as with xarray arithmetic."""
+    ds = ds_terms()
+    ds['tos'] = ds['tos'].astype('float32')
+    terms = spco2_decomposition(ds, detrend=False)
+    sens = spco2_sensitivity(ds).mean('time')
+    anomaly = ds['tos'] - ds['tos'].mean('time')
+    assert terms['tos'].dtype == np.float64
+    xr.testing.assert_allclose(terms['tos'], anomaly * sens['tos'])
+
+
+def test_spco2_decomposition_chunked_in_time(ds_terms):
+    """Tests that the decomposition supports dask data chunked along time."""
+    ds = ds_terms()
+    expected = spco2_decomposition(ds)
+    actual = spco2_decomposition(ds.chunk({'time': 12}))
+    assert actual.chunks is not None
+    xr.testing.assert_allclose(actual.compute(), expected)
+
+
+@pytest.mark.parametrize('deseasonalize', [False, True])
+def test_spco2_decomposition_mixed_chunks(ds_terms, deseasonalize):
+    """Tests that the decomposition supports variables chunked differently."""
+    ds = ds_terms()
+    expected = spco2_decomposition(ds, deseasonalize=deseasonalize)
+    ds['tos'] = ds['tos'].chunk({'lat': 1})
+    ds['sos'] = ds['sos'].chunk({'lat': 3})
+    actual = spco2_decomposition(ds, deseasonalize=deseasonalize)
+    xr.testing.assert_allclose(actual.compute(), expected)
+
+
+@pytest.mark.parametrize('chunk', [False, True])
+def test_spco2_decomposition_deseasonalize(ds_terms, chunk):
+    """Tests that deseasonalizing removes the monthly climatology of the
+    anomalies."""
+    ds = ds_terms()
+    if chunk:
+        ds = ds.chunk({'time': 12})
+    terms = spco2_decomposition(ds, detrend=False, deseasonalize=True)
+    sens = spco2_sensitivity(ds).mean('time')
+    anomaly = ds - ds.mean('time')
+    anomaly = anomaly.groupby('time.month') - anomaly.groupby('time.month').mean()
+    for var in ['tos', 'sos', 'talkos', 'dissicos']:
+        xr.testing.assert_allclose(
+            terms[var].compute(), (anomaly[var] * sens[var]).drop_vars('month')
+        )
+
+
+def test_temp_decomp_takahashi(ds_terms):
+    """Tests that the thermal and non-thermal components match the Takahashi et al.
+    (2002) formulation."""
+    ds = ds_terms()
+    decomp = temp_decomp_takahashi(ds)
+    tos_diff = ds['tos'] - ds['tos'].mean('time')
+    expected_thermal = np.exp(tos_diff * 0.0432) * ds['spco2'].mean('time')
+    expected_non_thermal = ds['spco2'] * np.exp(tos_diff * -0.0432)
+    xr.testing.assert_allclose(decomp['thermal'], expected_thermal.rename('thermal'))
+    xr.testing.assert_allclose(
+        decomp['non_thermal'], expected_non_thermal.rename('non_thermal')
+    )
+
+
+def test_spco2_decomposition_index_no_sliding_window(ds_terms, climate_index):
+    """Tests that the regression onto the index over the full time series matches
+    the least squares slope."""
+    ds = ds_terms()
+    index = climate_index()
+    terms = spco2_decomposition_index(ds, index, detrend=False, sliding_window=None)
+    # ``nanmean`` leaves behind a scalar time coordinate from its land mask.
+    terms = terms.drop_vars('time')
+
+    anomaly = ds - ds.mean('time')
+    sens = spco2_sensitivity(ds).mean('time')
+    for var in ['tos', 'sos', 'talkos', 'dissicos']:
+        slope = np.polyfit(index.values, anomaly[var].values.reshape(120, -1), 1)[0]
+        expected = slope.reshape(3, 3) * sens[var]
+        xr.testing.assert_allclose(terms[var], expected)
+
+
+@pytest.mark.parametrize('start', [0, 5])
+def test_spco2_decomposition_index_sliding_window(ds_terms, climate_index, start):
+    """Tests that the vectorized sliding window regression matches regressing each
+    window separately, including when the time series starts mid-year."""
+    ds = ds_terms().isel(time=slice(start, None))
+    index = climate_index().isel(time=slice(start, None))
+    sliding_window = 3
+    terms = spco2_decomposition_index(
+        ds, index, detrend=False, sliding_window=sliding_window
+    )
+
+    anomaly = ds - ds.mean('time')
+    sens = spco2_sensitivity(ds)
+    expected = []
+    for y1 in range(1990, 2000 - sliding_window):
+        window = slice(str(y1), str(y1 + sliding_window))
+        x = index.sel(time=window)
+        x_anom = x - x.mean('time')
+        y = anomaly.sel(time=window).drop_vars('spco2')
+        slope = (x_anom * (y - y.mean('time'))).sum('time') / (x_anom ** 2).sum('time')
+        expected.append(slope * sens.sel(time=window).mean('time'))
+    expected = xr.concat(expected, 'window').mean('window')
+    xr.testing.assert_allclose(terms, expected)
+
+
+def test_spco2_decomposition_index_sliding_window_nans(ds_terms, climate_index):
+    """Tests that window-mean sensitivities follow ``nanmean`` when the data has
+    missing values."""
+    ds = ds_terms()
+    ds['spco2'][:5, 0, 0] = np.nan
+    index = climate_index()
+    sliding_window = 3
+    terms = spco2_decomposition_index(
+        ds, index, detrend=False, sliding_window=sliding_window
+    )
+
+    anomaly = ds - nanmean(ds)
+    sens = spco2_sensitivity(ds)
+    expected = []
+    for y1 in range(1990, 2000 - sliding_window):
+        window = slice(str(y1), str(y1 + sliding_window))
+        x = index.sel(time=window)
+        x_anom = x - x.mean('time')
+        y = anomaly.sel(time=window).drop_vars('spco2')
+        slope = (x_anom * (y - y.mean('time'))).sum('time') / (x_anom ** 2).sum('time')
+        expected.append(slope * nanmean(sens.sel(time=window)))
+    expected = xr.concat(expected, 'window').mean('window')
+    xr.testing.assert_allclose(terms, expected)
+
+
+def test_potential_pco2():
+    """Tests that potential pCO2 is referenced to the surface temperature."""
+    dims = ['time', 'lat', 'depth']
+    coords = {'depth': np.arange(0, 500, 100)}
+    t_insitu = xr.DataArray(
+        np.random.uniform(0, 20, size=(12, 3, 5)), dims=dims, coords=coords
+    )
+    pco2_insitu = xr.DataArray(
+        np.random.uniform(350, 500, size=(12, 3, 5)), dims=dims, coords=coords
+    )
+    pco2_potential = potential_pco2(t_insitu, pco2_insitu)
+    expected = pco2_insitu * (1 + 0.0423 * (t_insitu.isel(depth=0) - t_insitu))
+    xr.testing.assert_allclose(pco2_potential, expected)
+    xr.testing.assert_allclose(pco2_potential.isel(depth=0), pco2_insitu.isel(depth=0))
+
+
+def test_potential_pco2_inner_join():
+    """Tests that inputs with mismatched coordinates are inner joined and that the
+    output follows the dimension order of ``pco2_insitu``."""
+    coords = {'time': np.arange(12), 'depth': np.arange(0, 500, 100)}
+    t_insitu = xr.DataArray(
+        np.random.uniform(0, 20, size=(12, 5)), dims=['time', 'depth'], coords=coords
+    )
+    pco2_insitu = xr.DataArray(
+        np.random.uniform(350, 500, size=(5, 12)),
+        dims=['depth', 'time'],
+        coords=coords,
+    ).isel(time=slice(3, None))
+    pco2_potential = potential_pco2(t_insitu, pco2_insitu)
+    expected = pco2_insitu * (1 + 0.0423 * (t_insitu.isel(depth=0) - t_insitu))
+    assert pco2_potential.dims == ('depth', 'time')
+    xr.testing.assert_identical(pco2_potential, expected)
+
+
+def test_spco2_decomposition_index_precomputed_sensitivity(ds_terms, climate_index):
+    """Tests that precomputed sensitivities can be passed in and are used."""
+    ds = ds_terms()
+    index = climate_index()
+    sens = spco2_sensitivity(ds)
+    expected = spco2_decomposition_index(ds, index, sliding_window=3)
+    actual = spco2_decomposition_index(
+        ds, index, sliding_window=3, pco2_sensitivity=sens
+    )
+    xr.testing.assert_allclose(actual, expected)
+    doubled = spco2_decomposition_index(
+        ds, index, sliding_window=3, pco2_sensitivity=2 * sens
+    )
+    xr.testing.assert_allclose(doubled, 2 * expected)
+
+
+def test_spco2_decomposition_index_precomputed_sensitivity_checks(
+    ds_terms, climate_index
+):
+    """Tests that inputs are validated when precomputed sensitivities are passed
+    in."""
+    ds = ds_terms()
+    index = climate_index()
+    sens = spco2_sensitivity(ds)
+    with pytest.raises(ValueError, match='Missing variables'):
+        spco2_decomposition_index(
+            ds.drop_vars('sos'), index, sliding_window=3, pco2_sensitivity=sens
+        )
+    with pytest.raises(ValueError, match='time dimension'):
+        spco2_decomposition_index(
+            ds, index, sliding_window=3, pco2_sensitivity=sens.mean('time')
+        )
+
+
+def test_schmidt(ds_terms):
+    """Tests that the Schmidt number matches the polynomial in Sarmiento and Gruber
+    (2006) and stays lazy for dask inputs."""
+    t = ds_terms()['tos']
+    expected = 2073.1 - 125.62 * t + 3.6276 * t ** 2 - 0.043219 * t ** 3
+    Sc = schmidt(t.chunk({'time': 12}))
+    assert Sc.chunks is not None
+    xr.testing.assert_allclose(Sc.compute(), expected)
+
+
+def test_co2_sol(ds_terms):
+    """Tests that CO2 solubility matches Weiss and Price (1980) and stays lazy for
+    dask inputs."""
+    ds = ds_terms()
+    t = (ds['tos'] + 273.15) * 0.01
+    d0 = 0.0049867 * t ** 2 - 0.025225 * t + 0.025695
+    expected = np.exp(
+        -162.8301
+        + 218.2968 / t
+        + 90.9241 * np.log(t)
+        - 1.47696 * t ** 2
+        + d0 * ds['sos']
+    )
+    ff = co2_sol(ds['tos'].chunk({'time': 12}), ds['sos'].chunk({'time': 12}))
+    assert ff.chunks is not None
+    assert ff.attrs['units'] == 'mol/kg/atm'
+    xr.testing.assert_allclose(ff.compute(), expected)
+
+
+@pytest.mark.parametrize(
+    'func', [spco2_sensitivity, spco2_decomposition, temp_decomp_takahashi]
+)
+def test_float32_dtype(ds_terms, func):
+    """Tests that computations can be run in single precision."""
+    ds = ds_terms()
+    expected = func(ds)
+    actual = func(ds, dtype='float32')
+    for var in actual.data_vars:
+        assert actual[var].dtype == np.float32
+    xr.testing.assert_allclose(actual.astype('float64'), expected, rtol=1e-4)
+
+
+@pytest.mark.parametrize('sliding_window', [None, 3])
+def test_spco2_decomposition_index_float32_dtype(
+    ds_terms, climate_index, sliding_window
+):
+    """Tests that the regression onto an index can be run in single precision."""
+    ds = ds_terms()
+    index = climate_index()
+    expected = spco2_decomposition_index(ds, index, sliding_window=sliding_window)
+    actual = spco2_decomposition_index(
+        ds, index, sliding_window=sliding_window, dtype='float32'
+    )
+    for var in actual.data_vars:
+        assert actual[var].dtype == np.float32
+    xr.testing.assert_allclose(actual.astype('float64'), expected, rtol=1e-3)
+
+
+@pytest.mark.parametrize('sliding_window', [None, 3])
+def test_spco2_decomposition_index_chunked_index(
+    ds_terms, climate_index, sliding_window
+):
+    """Tests that the index may be a dask array chunked along time."""
+    ds = ds_terms()
+    index = climate_index()
+    expected = spco2_decomposition_index(ds, index, sliding_window=sliding_window)
+    actual = spco2_decomposition_index(
+        ds, index.chunk({'time': 12}), sliding_window=sliding_window
+    )
+    xr.testing.assert_allclose(actual.compute(), expected)
+
+
+@pytest.mark.parametrize('sliding_window', [None, 3])
+def test_spco2_decomposition_index_shorter_index(
+    ds_terms, climate_index, sliding_window
+):
+    """Tests that the regression is restricted to the time span of the index."""
+    ds = ds_terms()
+    index = climate_index()
+    index = index.isel(time=slice(24, None))
+    pco2_sensitivity = spco2_sensitivity(ds)
+    expected = spco2_decomposition_index(
+        ds.isel(time=slice(24, None)),
+        index,
+        detrend=False,
+        sliding_window=sliding_window,
+        pco2_sensitivity=pco2_sensitivity.isel(time=slice(24, None)),
+    )
+    actual = spco2_decomposition_index(
+        ds,
+        index,
+        detrend=False,
+        sliding_window=sliding_window,
+        pco2_sensitivity=pco2_sensitivity,
+    )
+    xr.testing.assert_allclose(actual, expected)
+
+
+def test_spco2_decomposition_index_sliding_window_too_long(ds_terms, climate_index):
+    """Tests that an error is raised if no sliding window fits in the time
+    series."""
+    ds = ds_terms()
+    index = climate_index()
+    with pytest.raises(ValueError, match='sliding_window'):
+        spco2_decomposition_index(ds, index, sliding_window=10)